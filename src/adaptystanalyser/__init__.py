@@ -2,3 +2,5 @@
 # SPDX-License-Identifier: LGPL-3.0-or-later
 
 from .results import *
+from .admission import DeadlineExceeded, check_deadline, get_remaining_time
+from .timing import phase, add_phase
@@ -0,0 +1,193 @@
+# SPDX-FileCopyrightText: 2026 CERN
+# SPDX-License-Identifier: LGPL-3.0-or-later
+
+import os
+import time
+import fcntl
+import threading
+from pathlib import Path
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+
+_deadline = ContextVar('deadline', default=None)
+
+
+class AdmissionRejected(Exception):
+    """
+    An exception raised when a request cannot be admitted because
+    all slots and queue places are taken.
+    """
+
+    def __init__(self, retry_after: int):
+        super().__init__('The request has been rejected, retry after '
+                         f'{retry_after} s')
+        self.retry_after = retry_after
+
+
+class DeadlineExceeded(Exception):
+    """
+    An exception raised by check_deadline() when the deadline of
+    the current request has passed.
+    """
+    pass
+
+
+def get_remaining_time():
+    """
+    Get the time left until the deadline of the current request.
+
+    :return: The number of seconds left (possibly negative) or None
+             if there is no deadline.
+    """
+    deadline = _deadline.get()
+
+    if deadline is None:
+        return None
+
+    return deadline - time.monotonic()
+
+
+def check_deadline():
+    """
+    Check whether the deadline of the current request has passed.
+    Modules are expected to call this function regularly during long
+    computations in process().
+
+    :raises DeadlineExceeded: When the deadline has passed.
+    """
+    remaining = get_remaining_time()
+
+    if remaining is not None and remaining <= 0:
+        raise DeadlineExceeded('The deadline of the request has passed!')
+
+
+@contextmanager
+def deadline(seconds):
+    """
+    Set the deadline for the code run inside the context.
+
+    :param seconds: The number of seconds from now. If None, there
+                    is no deadline.
+    """
+    if seconds is None:
+        token = _deadline.set(None)
+    else:
+        token = _deadline.set(time.monotonic() + seconds)
+
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+class ConcurrencyLimiter:
+    """
+    A class limiting the number of concurrently running requests across
+    all processes using the same lock directory, with a bounded queue of
+    waiting requests.
+
+    Slots are files locked with flock(), so they are released
+    automatically if a process dies.
+    """
+
+    def __init__(self, path: Path, max_concurrency: int,
+                 max_queue: int = 0, queue_timeout: float = 5):
+        """
+        Construct a ConcurrencyLimiter object.
+
+        :param pathlib.Path path: The directory for the slot files.
+        :param int max_concurrency: The maximum number of requests
+                                    running at the same time.
+        :param int max_queue: The maximum number of requests waiting
+                              for a free slot.
+        :param float queue_timeout: The maximum time in seconds a request
+                                    can wait for a free slot.
+        """
+        path.mkdir(parents=True, exist_ok=True)
+        self._slots = [path / f'slot-{i}.lock'
+                       for i in range(max_concurrency)]
+        self._queue = [path / f'queue-{i}.lock' for i in range(max_queue)]
+        self._queue_timeout = queue_timeout
+
+    def _try_acquire(self, paths):
+        for path in paths:
+            fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                return fd
+            except BlockingIOError:
+                os.close(fd)
+
+        return None
+
+    def _release(self, fd):
+        fcntl.flock(fd, fcntl.LOCK_UN)
+        os.close(fd)
+
+    @contextmanager
+    def admit(self):
+        """
+        Run the code inside the context in one of the slots, waiting
+        in the queue if necessary.
+
+        :raises AdmissionRejected: When the queue is full or no slot
+                                   has been freed in time.
+        """
+        fd = self._try_acquire(self._slots)
+
+        if fd is None:
+            queue_fd = self._try_acquire(self._queue)
+
+            if queue_fd is None:
+                raise AdmissionRejected(1)
+
+            try:
+                end = time.monotonic() + self._queue_timeout
+
+                while fd is None and time.monotonic() < end:
+                    time.sleep(0.01)
+                    fd = self._try_acquire(self._slots)
+            finally:
+                self._release(queue_fd)
+
+            if fd is None:
+                raise AdmissionRejected(max(1, round(self._queue_timeout)))
+
+        try:
+            yield
+        finally:
+            self._release(fd)
+
+
+class LocalLimiter:
+    """
+    A class limiting the number of concurrently running requests within
+    a single process. Requests above the limit are rejected immediately
+    so that they never occupy a thread reserved for other requests.
+    """
+
+    def __init__(self, max_concurrency: int):
+        """
+        Construct a LocalLimiter object.
+
+        :param int max_concurrency: The maximum number of requests
+                                    running at the same time.
+        """
+        self._semaphore = threading.BoundedSemaphore(max_concurrency)
+
+    @contextmanager
+    def admit(self):
+        """
+        Run the code inside the context if the limit allows it.
+
+        :raises AdmissionRejected: When the limit is reached.
+        """
+        if not self._semaphore.acquire(blocking=False):
+            raise AdmissionRejected(1)
+
+        try:
+            yield
+        finally:
+            self._semaphore.release()
@@ -2,11 +2,24 @@
 # SPDX-License-Identifier: LGPL-3.0-or-later
 
 import traceback
+import io
 import yaml
 import json
-from flask import Flask, render_template, request
+import hashlib
+import mimetypes
+import tempfile
+import time
+from fnmatch import fnmatchcase
+from contextlib import contextmanager, ExitStack
+from flask import Flask, render_template, request, make_response, g
+from werkzeug.wsgi import wrap_file
 from pathlib import Path
-from . import PerformanceAnalysisResults
+from . import PerformanceAnalysisResults, SessionFile, SessionDataReader, \
+    FederatedStorage
+from .admission import ConcurrencyLimiter, LocalLimiter, \
+    AdmissionRejected, DeadlineExceeded, deadline
+from .timing import start_collecting, get_phases, add_phase, phase, \
+    format_header
 from importlib.metadata import version
 from importlib import import_module
 
@@ -21,6 +34,10 @@ if 'PERFORMANCE_ANALYSIS_STORAGE' not in app.config:
                        'Adaptyst performance analysis results are stored.')
 
 
+storage = FederatedStorage(app.config['PERFORMANCE_ANALYSIS_STORAGE'],
+                           float(app.config.get('STORAGE_TIMEOUT', 5)))
+
+
 static_path = Path(app.root_path) / 'static'
 scripts = ['jquery.min.js'] + \
     list(sorted(filter(lambda x: x != 'jquery.min.js',
@@ -45,22 +62,204 @@ for p in static_path.glob('modules/*/settings.html'):
     backend['settings_code'] = p.read_text()
     backends.append(backend)
 
+if 'DATA_CACHE_BUDGET' in app.config:
+    SessionDataReader.memory_budget = int(app.config['DATA_CACHE_BUDGET'])
+
+if 'ADMISSION_PATH' in app.config:
+    admission_path = Path(app.config['ADMISSION_PATH'])
+else:
+    admission_path = Path(tempfile.gettempdir()) / \
+        ('adaptyst-analyser-' + hashlib.sha1(
+            str(app.config['PERFORMANCE_ANALYSIS_STORAGE']).encode()
+        ).hexdigest()[:16])
+
+# The number of module requests and file downloads a worker can handle
+# at the same time, the remaining threads are reserved for the core routes.
+if 'MODULE_WORKER_CAPACITY' in app.config:
+    worker_limiter = LocalLimiter(
+        max(1, int(app.config['MODULE_WORKER_CAPACITY'])))
+else:
+    worker_limiter = None
+
 min_mod_vers = {}
+served_files = {}
+module_limiters = {}
+module_timeouts = {}
+server_version = hashlib.sha1(version('adaptyst-analyser').encode())
 
-for p in Path(app.root_path).glob('modules/*/metadata.yml'):
+for p in sorted(Path(app.root_path).glob('modules/*/metadata.yml')):
     mod_id = p.parent.name
     with p.open(mode='r') as f:
         metadata = yaml.safe_load(f)
     min_mod_vers[mod_id] = metadata.get('min_module_version', [])
+    served_files[mod_id] = metadata.get('served_files', [])
+    module_timeouts[mod_id] = metadata.get(
+        'timeout', app.config.get('MODULE_TIMEOUT'))
+
+    if 'max_concurrency' in metadata:
+        module_limiters[mod_id] = ConcurrencyLimiter(
+            admission_path / mod_id, metadata['max_concurrency'],
+            metadata.get('max_queue', 0), metadata.get('queue_timeout', 5))
+
+    server_version.update(f'{mod_id}:{p.resolve().parent.name}:'
+                          f'{metadata.get("version")};'.encode())
+
+server_version = server_version.hexdigest()
+
+
+class SlotFile(io.BufferedReader):
+    """
+    A file opened for reading which releases a worker slot when it
+    is closed, so that a file sent after its request handler has
+    returned still counts towards the limit of the worker.
+    """
+
+    def __init__(self, path, slot: ExitStack):
+        super().__init__(io.FileIO(path, mode='rb'))
+        self._slot = slot
+
+    def close(self):
+        try:
+            super().close()
+        finally:
+            self._slot.close()
+
+
+def reserve_worker():
+    # Returns the ExitStack holding a worker slot (if worker capacity
+    # is limited).
+    stack = ExitStack()
+    start = time.perf_counter()
+
+    if worker_limiter is not None:
+        stack.enter_context(worker_limiter.admit())
+
+    add_phase('queue', (time.perf_counter() - start) * 1000,
+              'Admission control')
+    return stack
+
+
+@contextmanager
+def admit(module):
+    start = time.perf_counter()
+
+    with ExitStack() as stack:
+        if module in module_limiters:
+            stack.enter_context(module_limiters[module].admit())
+
+        add_phase('queue', (time.perf_counter() - start) * 1000,
+                  'Admission control')
+        yield
+
+
+@app.before_request
+def before_request():
+    g.start_time = time.perf_counter()
+    start_collecting()
+
+
+@app.after_request
+def after_request(response):
+    add_phase('total', (time.perf_counter() - g.start_time) * 1000,
+              'Total')
+    response.headers['Server-Timing'] = format_header(get_phases())
+    return response
+
+
+def read_range(f, length, buffer_size=65536):
+    try:
+        while length > 0:
+            data = f.read(min(length, buffer_size))
+
+            if len(data) == 0:
+                break
+
+            length -= len(data)
+            yield data
+    finally:
+        f.close()
+
+
+def is_inside(path, root):
+    try:
+        path.relative_to(root)
+        return True
+    except ValueError:
+        return False
+
+
+def send_session_file(session_file, session_path, worker_slot):
+    path = session_file.path.resolve()
+
+    if not is_inside(path, session_path.resolve()) or not path.is_file():
+        raise ValueError(f'{str(path)} is not a file in {session_path}')
+
+    size = path.stat().st_size
+    start = min(max(session_file.start, 0), size)
+    end = size if session_file.length is None else \
+        min(size, start + session_file.length)
+    window = end - start
+
+    if session_file.mimetype is None:
+        mimetype = mimetypes.guess_type(path.name)[0] or \
+            'application/octet-stream'
+    else:
+        mimetype = session_file.mimetype
+
+    status = 200
+    range_start, range_end = 0, window
+
+    # Multi-range requests are answered with the whole window, which
+    # RFC 9110 allows.
+    if request.range is not None and len(request.range.ranges) == 1:
+        byte_range = request.range.range_for_length(window)
+
+        if byte_range is None:
+            response = make_response('', 416)
+            response.headers['Content-Range'] = f'bytes */{window}'
+            return response
+
+        range_start, range_end = byte_range
+        status = 206
+
+    # The worker slot is released once the server closes the file.
+    f = SlotFile(path, worker_slot.pop_all())
+    f.seek(start + range_start)
+
+    if 'wsgi.file_wrapper' in request.environ:
+        # The WSGI server can send the file with sendfile(), it never
+        # sends more than Content-Length bytes (see PEP 3333).
+        body = wrap_file(request.environ, f)
+    else:
+        body = read_range(f, range_end - range_start)
+
+    response = app.response_class(body, status=status, mimetype=mimetype,
+                                  direct_passthrough=True)
+    response.content_length = range_end - range_start
+    response.accept_ranges = 'bytes'
+
+    if status == 206:
+        response.headers['Content-Range'] = \
+            f'bytes {range_start}-{range_end - 1}/{window}'
+
+    if session_file.download_name is not None:
+        response.headers.set('Content-Disposition', 'attachment',
+                             filename=session_file.download_name)
+
+    return response
 
 
 @app.get('/<identifier>/')
 def get(identifier):
     try:
-        results = PerformanceAnalysisResults(
-            app.config['PERFORMANCE_ANALYSIS_STORAGE'],
-            identifier)
-        return results.get_system_graph()
+        reader = SessionDataReader.get(*storage.resolve(identifier))
+        with phase('graph', 'System graph serialization'):
+            graph = reader.results.get_system_graph()
+
+        response = make_response(graph)
+        response.headers['X-Session-Version'] = hashlib.sha1(
+            (server_version + reader.get_version()).encode()).hexdigest()
+        return response
     except ValueError:
         return '', 404
 
@@ -74,8 +273,41 @@ def post(identifier, entity, node, module):
             traceback.print_exc()
             return '', 404
 
-        return backend.process(app.config['PERFORMANCE_ANALYSIS_STORAGE'],
-                               identifier, entity, node, request.values)
+        root, folder = storage.resolve(identifier)
+
+        with reserve_worker() as worker_slot:
+            with admit(module), deadline(module_timeouts.get(module)), \
+                 phase('process', 'Module processing'):
+                result = backend.process(root, folder, entity, node,
+                                         request.values)
+
+            if isinstance(result, SessionFile):
+                # parents[3] is the session folder
+                return send_session_file(
+                    result, PerformanceAnalysisResults.get_module_path(
+                        root, folder, entity, node, module).parents[3],
+                    worker_slot)
+
+        response = make_response(result)
+
+        if response.status_code == 200 and not response.is_streamed:
+            response.add_etag()
+            etag = response.get_etag()[0]
+
+            if etag in request.if_none_match:
+                cache_control = response.headers.get('Cache-Control')
+                response = make_response('', 304)
+                response.set_etag(etag)
+
+                if cache_control is not None:
+                    response.headers['Cache-Control'] = cache_control
+
+        return response
+    except AdmissionRejected as e:
+        return '', 503, {'Retry-After': str(e.retry_after)}
+    except DeadlineExceeded:
+        traceback.print_exc()
+        return '', 504
     except ValueError:
         traceback.print_exc()
         return '', 404
@@ -84,6 +316,29 @@ def post(identifier, entity, node, module):
         return '', 500
 
 
+@app.get('/<identifier>/<entity>/<node>/<module>/files/<path:filename>')
+def get_file(identifier, entity, node, module, filename):
+    if not any(fnmatchcase(filename, pattern)
+               for pattern in served_files.get(module, [])):
+        return '', 404
+
+    try:
+        module_path = PerformanceAnalysisResults.get_module_path(
+            *storage.resolve(identifier), entity, node, module).resolve()
+        path = (module_path / filename).resolve()
+
+        if not is_inside(path, module_path):
+            return '', 404
+
+        with reserve_worker() as worker_slot:
+            return send_session_file(SessionFile(path), module_path,
+                                     worker_slot)
+    except AdmissionRejected as e:
+        return '', 503, {'Retry-After': str(e.retry_after)}
+    except ValueError:
+        return '', 404
+
+
 @app.route('/')
 def main():
     if 'CUSTOM_TITLE' in app.config and len(app.config.get('CUSTOM_TITLE')) > 0:
@@ -96,10 +351,15 @@ def main():
     else:
         background = 'gray'
 
+    with phase('listing', 'Session listing'):
+        ids = storage.get_all_folders()
+
     return render_template(
         'viewer.html',
-        ids=PerformanceAnalysisResults.get_all_folders(
-            app.config['PERFORMANCE_ANALYSIS_STORAGE']),
+        ids=ids,
+        unavailable_roots=[(name, health['error'])
+                           for name, health in storage.get_health().items()
+                           if health['available'] is False],
         scripts=scripts,
         stylesheets=stylesheets,
         version='v' + version('adaptyst-analyser'),
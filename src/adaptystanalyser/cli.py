@@ -3,17 +3,389 @@
 
 import argparse
 import sys
+import re
 import subprocess
 import os
 import yaml
 import shutil
-import filecmp
+import json
+import hashlib
+import time
+import traceback
 import urllib.request
-from urllib.parse import urlparse
+from urllib.parse import urlparse, quote
 from pathlib import Path
 from importlib import import_module
 from importlib.metadata import version
+from collections import defaultdict
 from tempfile import NamedTemporaryFile
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, \
+    as_completed
+from .results import PerformanceAnalysisResults
+
+
+def _sha256_file(path):
+    digest = hashlib.sha256()
+
+    with path.open(mode='rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+
+    return digest.hexdigest()
+
+
+def _default_js_cache_path():
+    cache_home = os.environ.get('XDG_CACHE_HOME', '')
+
+    if len(cache_home) == 0:
+        cache_home = Path.home() / '.cache'
+
+    return Path(cache_home) / 'adaptyst-analyser' / 'js'
+
+
+def _get_source_url(url, mirror):
+    if mirror is None or len(mirror) == 0:
+        return url
+
+    name = Path(urlparse(url).path).name
+
+    if '://' in mirror:
+        return mirror.rstrip('/') + '/' + quote(name)
+
+    return (Path(mirror) / name).resolve().as_uri()
+
+
+def _fetch_js_dependency(url, sha256, cache_path, mirror):
+    """
+    Fetch a JavaScript/CSS dependency into the content-addressed cache.
+
+    Nothing is downloaded if the expected SHA-256 hash is known and
+    the corresponding object is already in the cache.
+
+    :return: The tuple of the SHA-256 hash and the path to the cached
+             object.
+    :raises ValueError: When the downloaded file doesn't match
+                        the expected hash.
+    """
+    if sha256 is not None and (cache_path / 'sha256' / sha256).is_file():
+        return sha256, cache_path / 'sha256' / sha256
+
+    source_url = _get_source_url(url, mirror)
+    digest = hashlib.sha256()
+
+    print(f'Downloading {url} from {source_url}...', file=sys.stderr)
+
+    with urllib.request.urlopen(source_url) as data:
+        with NamedTemporaryFile(dir=cache_path / 'tmp',
+                                delete=False) as tf:
+            for chunk in iter(lambda: data.read(1 << 20), b''):
+                digest.update(chunk)
+                tf.write(chunk)
+
+            tf_path = Path(tf.name)
+
+    result = digest.hexdigest()
+
+    if sha256 is not None and result != sha256:
+        tf_path.unlink()
+        raise ValueError(f'{url} does not match its pinned SHA-256 hash '
+                         f'(expected {sha256}, got {result})')
+
+    obj_path = cache_path / 'sha256' / result
+    tf_path.chmod(0o644)
+    os.replace(tf_path, obj_path)
+
+    return result, obj_path
+
+
+def _fetch_js_dependencies(deps, cache_path, mirror, jobs=8):
+    """
+    Fetch JavaScript/CSS dependencies concurrently into the
+    content-addressed cache at a given path.
+
+    Hashes not provided explicitly are taken from the pins recorded
+    in the cache during the first successful download of a given URL.
+
+    :param list deps: The list of (URL, SHA-256 hash or None) tuples.
+    :param pathlib.Path cache_path: The path to the cache directory.
+    :param str mirror: The directory or URL base replacing the remote
+                       URLs (only the file names are kept). It can be None.
+    :param int jobs: The maximum number of concurrent downloads.
+    :return: The tuple of the dictionary mapping URLs to the paths
+             of cached objects and the list of error messages.
+    """
+    (cache_path / 'sha256').mkdir(parents=True, exist_ok=True)
+    (cache_path / 'tmp').mkdir(parents=True, exist_ok=True)
+    pins_path = cache_path / 'pins.json'
+
+    if pins_path.exists():
+        with pins_path.open(mode='r') as f:
+            pins = json.load(f)
+    else:
+        pins = {}
+
+    objects = {}
+    errors = []
+
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        futures = {
+            url: executor.submit(_fetch_js_dependency, url,
+                                 sha256 if sha256 is not None
+                                 else pins.get(url),
+                                 cache_path, mirror)
+            for url, sha256 in deps
+        }
+
+        for url, future in futures.items():
+            try:
+                sha256, objects[url] = future.result()
+                pins[url] = sha256
+            except (OSError, ValueError) as e:
+                errors.append(f'could not fetch {url}: {e}')
+
+    with NamedTemporaryFile(mode='w', dir=cache_path / 'tmp',
+                            delete=False) as tf:
+        json.dump(pins, tf, indent=2, sort_keys=True)
+
+    os.replace(tf.name, pins_path)
+
+    return objects, errors
+
+
+def _install_cached_file(obj_path, dst_path):
+    if dst_path.exists() and not dst_path.is_symlink() and \
+       os.path.samefile(obj_path, dst_path):
+        return
+
+    tmp_path = dst_path.parent / f'.{dst_path.name}.tmp'
+
+    if tmp_path.exists() or tmp_path.is_symlink():
+        tmp_path.unlink()
+
+    try:
+        os.link(obj_path, tmp_path)
+    except OSError:
+        shutil.copy2(obj_path, tmp_path)
+
+    os.replace(tmp_path, dst_path)
+
+
+def _get_recorded_sha256(path, record):
+    # Returns the hash of an installed file, reading the file only if it
+    # has changed since its hash was recorded.
+    stat = path.stat()
+
+    if record is not None and record.get('size') == stat.st_size and \
+       record.get('mtime_ns') == stat.st_mtime_ns:
+        return record['sha256']
+
+    return _sha256_file(path)
+
+
+def _record_sha256(path):
+    stat = path.stat()
+    return {'sha256': _sha256_file(path), 'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns}
+
+
+def _files_equal(src, dst, record=None):
+    src_stat, dst_stat = src.stat(), dst.stat()
+
+    if src_stat.st_size != dst_stat.st_size:
+        return False
+
+    if os.path.samestat(src_stat, dst_stat):
+        return True
+
+    return _sha256_file(src) == _get_recorded_sha256(dst, record)
+
+
+def _scan_module_item(item, rel, old_files, files, sources):
+    if item.is_symlink():
+        files[rel] = {'type': 'symlink', 'target': os.readlink(item)}
+    elif item.is_dir():
+        files[rel] = {'type': 'dir'}
+
+        for child in sorted(item.iterdir()):
+            _scan_module_item(child, rel + '/' + child.name, old_files,
+                              files, sources)
+    else:
+        stat = item.stat()
+        old = old_files.get(rel, {})
+
+        if old.get('type') == 'file' and old.get('size') == stat.st_size \
+           and old.get('mtime_ns') == stat.st_mtime_ns:
+            sha256 = old['sha256']
+        else:
+            sha256 = _sha256_file(item)
+
+        files[rel] = {'type': 'file', 'sha256': sha256,
+                      'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+        sources[rel] = item
+
+
+def _scan_module(trees, old_files, development):
+    """
+    Build the install manifest of a module.
+
+    Source files whose size and modification time match the previous
+    manifest are not read again.
+
+    :param dict trees: The dictionary mapping manifest prefixes ("python"
+                       and "web") to lists of top-level items to install.
+    :param dict old_files: The "files" part of the manifest of the
+                           currently installed module version (it can
+                           be empty).
+    :param bool development: Whether top-level items should be installed
+                             as symlinks to the source.
+    :return: The tuple of the manifest dictionary and the dictionary
+             mapping manifest entries of regular files to their
+             source paths.
+    """
+    files = {}
+    sources = {}
+
+    for prefix, items in trees.items():
+        for item in items:
+            rel = prefix + '/' + item.name
+
+            if development and item.name != 'metadata.yml':
+                files[rel] = {'type': 'symlink',
+                              'target': str(item.resolve())}
+            else:
+                _scan_module_item(item, rel, old_files, files, sources)
+
+    digest = hashlib.sha256(json.dumps(
+        {rel: [entry['type'], entry.get('sha256', entry.get('target'))]
+         for rel, entry in files.items()},
+        sort_keys=True).encode()).hexdigest()
+
+    return {'digest': digest, 'files': files}, sources
+
+
+def _materialise_module(manifest, sources, old_manifest, old_roots,
+                        new_roots):
+    """
+    Create a new module tree based on its install manifest.
+
+    Files unchanged since the currently installed version are hardlinked
+    from the installed tree where possible, everything else is copied
+    from the source.
+    """
+    old_files = old_manifest.get('files', {})
+
+    for root in new_roots.values():
+        root.mkdir(parents=True)
+
+    for rel, entry in sorted(manifest['files'].items()):
+        prefix, sub = rel.split('/', 1)
+        dst = new_roots[prefix] / sub
+
+        if entry['type'] == 'dir':
+            dst.mkdir()
+        elif entry['type'] == 'symlink':
+            dst.symlink_to(entry['target'])
+        else:
+            old = old_roots[prefix] / sub
+            old_entry = old_files.get(rel, {})
+
+            if old_entry.get('sha256') == entry['sha256'] and \
+               not old.is_symlink() and old.is_file():
+                try:
+                    os.link(old, dst)
+                    continue
+                except OSError:
+                    pass
+
+            shutil.copy2(sources[rel], dst, follow_symlinks=False)
+
+
+def _activate_module_tree(link_path, store_path, tree_name):
+    """
+    Atomically point the installed module path at a given tree from
+    the module store and remove all other trees of the module.
+    """
+    tmp_path = link_path.parent / f'.{link_path.name}.new'
+
+    if tmp_path.is_symlink() or tmp_path.exists():
+        tmp_path.unlink()
+
+    tmp_path.symlink_to(os.path.relpath(store_path / tree_name,
+                                        link_path.parent))
+
+    if link_path.is_dir() and not link_path.is_symlink():
+        # Installed by an older version of Adaptyst Analyser without
+        # the module store, it cannot be swapped atomically.
+        legacy_path = store_path / f'legacy-{os.getpid()}'
+        os.rename(link_path, legacy_path)
+
+    os.replace(tmp_path, link_path)
+
+    for item in store_path.iterdir():
+        if item.name == tree_name:
+            continue
+
+        if item.is_dir() and not item.is_symlink():
+            shutil.rmtree(item)
+        else:
+            item.unlink()
+
+
+def _precompute_session(storage, folder, module_tokens):
+    """
+    Precompute the caches of a performance analysis session, including
+    the ones of modules providing a precompute() hook, unless they are
+    already up to date.
+
+    :param str storage: The path string to a performance analysis
+                        results directory.
+    :param str folder: The folder of a session in the directory.
+    :param dict module_tokens: The dictionary mapping installed module
+                               names to tokens identifying their versions.
+    :return: The tuple of the status string and the list of error
+             messages.
+    """
+    results = PerformanceAnalysisResults(storage, folder)
+    node_modules = results.get_node_modules()
+    hooks = {}
+
+    for module in set(x[2] for x in node_modules):
+        if module not in module_tokens:
+            continue
+
+        backend = import_module(f'adaptystanalyser.modules.{module}')
+
+        if hasattr(backend, 'precompute'):
+            hooks[module] = backend.precompute
+
+    precomputed = results.get_precomputed_modules()
+
+    if precomputed is not None and \
+       all(precomputed.get(module) == module_tokens[module]
+           for module in hooks.keys()):
+        return 'up to date', []
+
+    errors = []
+    done = {}
+
+    for module, hook in hooks.items():
+        if precomputed is not None and \
+           precomputed.get(module) == module_tokens[module]:
+            done[module] = module_tokens[module]
+            continue
+
+        try:
+            for entity, node, node_module in node_modules:
+                if node_module == module:
+                    hook(storage, folder, entity, node)
+
+            done[module] = module_tokens[module]
+        except Exception:
+            errors.append(f'{module}: {traceback.format_exc()}')
+
+    results.precompute(done)
+
+    return 'precomputed', errors
 
 
 def main():
@@ -21,11 +393,20 @@ def main():
                                      description='Adaptyst Analyser web '
                                      'server')
 
-    parser.add_argument('results', metavar='PATH', nargs='?',
+    parser.add_argument('results', metavar='PATH', nargs='*',
                         help='relative or absolute path to a performance '
                         'analysis results '
                         'directory to inspect or an Adaptyst Analyser module '
-                        'directory to install')
+                        'directory to install (several results directories '
+                        'can be inspected at once, each optionally prefixed '
+                        'with NAME= to set the name the sessions are '
+                        'grouped under, by default the directory name)')
+    parser.add_argument('--storage-timeout', metavar='SECONDS',
+                        dest='storage_timeout', type=float, default=5,
+                        help='time after which a results directory that '
+                        'is still being scanned is reported as unavailable '
+                        'and skipped in the session list (only if several '
+                        'results directories are inspected), default: 5')
     parser.add_argument('--version', action='version', help='print '
                         'version and exit', version='v' + version(
                             'adaptyst-analyser'))
@@ -35,6 +416,26 @@ def main():
                         help='address and port to bind to, '
                         'default: 127.0.0.1:8000',
                         default='127.0.0.1:8000')
+    parser.add_argument('-w',
+                        metavar='WORKERS', dest='workers', type=int,
+                        default=1, help='number of web server worker '
+                        'processes, default: 1')
+    parser.add_argument('--threads',
+                        metavar='THREADS', dest='threads', type=int,
+                        default=4, help='number of threads per web server '
+                        'worker process, default: 4')
+    parser.add_argument('--reserved-threads',
+                        metavar='THREADS', dest='reserved_threads', type=int,
+                        default=1, help='number of threads per web server '
+                        'worker process that cannot be used by module '
+                        'requests and file downloads so that the core '
+                        'routes stay responsive, '
+                        'default: 1')
+    parser.add_argument('--module-timeout',
+                        metavar='SECONDS', dest='module_timeout', type=float,
+                        default=None, help='default deadline for module '
+                        'requests (modules can override it with "timeout" '
+                        'in their metadata.yml), default: no deadline')
     parser.add_argument('-t',
                         metavar='TITLE', dest='title', type=str, default='',
                         help='custom title to be displayed alongside '
@@ -49,12 +450,35 @@ def main():
     parser.add_argument('--force-install', dest='reinstall_js_deps',
                         action='store_true', help='(re)install all core JavaScript '
                         'dependencies even if they are already set up')
+    parser.add_argument('--js-cache', metavar='DIR', dest='js_cache',
+                        type=str, default=str(_default_js_cache_path()),
+                        help='directory of the content-addressed cache of '
+                        'downloaded JavaScript dependencies, '
+                        'default: %(default)s')
+    parser.add_argument('--js-mirror', metavar='DIR_OR_URL',
+                        dest='js_mirror', type=str,
+                        default=os.environ.get('ADAPTYST_ANALYSER_JS_MIRROR'),
+                        help='directory or URL base (e.g. file:///mirror) '
+                        'replacing the remote URLs of JavaScript '
+                        'dependencies, files are looked up by their names '
+                        '(default: the value of the '
+                        'ADAPTYST_ANALYSER_JS_MIRROR environment variable '
+                        'if set)')
     parser.add_argument('-u', dest='update', action='store_true',
                         help='update/reinstall the module if it is already '
                         'installed')
     parser.add_argument('-d', dest='development',
                         action='store_true',
                         help='install the module in development mode')
+    parser.add_argument('--precompute', dest='precompute',
+                        action='store_true', help='precompute the caches '
+                        'used by the web server for all sessions in '
+                        'the results directories, skipping the sessions '
+                        'which are already up to date, and exit')
+    parser.add_argument('-j', metavar='JOBS', dest='jobs', type=int,
+                        default=os.cpu_count(), help='number of parallel '
+                        'processes for --precompute, default: number of '
+                        'CPUs')
     parser.add_argument('-l', dest='list', action='store_true',
                         help='list in detail all installed Adaptyst Analyser '
                         'modules')
@@ -62,17 +486,37 @@ def main():
     args = parser.parse_args()
 
     static_path = Path(__file__).parent / 'static'
+    js_cache_path = Path(args.js_cache)
+    # The (URL, SHA-256 hash) tuples of the core dependencies. Versioned
+    # CDN assets are immutable and are pinned here, the others (hash
+    # set to None) are pinned on their first download, see
+    # _fetch_js_dependencies().
     js_dependencies = {
-        'jquery.min.js': 'https://code.jquery.com/jquery-3.7.1.min.js',
-        'sigma-base.min.js': 'https://cdnjs.cloudflare.com/ajax/libs'
-        '/sigma.js/3.0.2/sigma.min.js',
-        'sigma-edge-curve.js': 'https://cernbox.cern.ch/remote.php/dav'
-        '/public-files/GN8XhQhKJAfG1yH/sigma-edge-curve.js',
-        'graphology.umd.min.js': 'https://cdnjs.cloudflare.com/ajax/libs'
-        '/graphology/0.26.0/graphology.umd.min.js',
-        'graphology-layout-forceatlas2.js': 'https://cernbox.cern.ch/'
-        'remote.php/dav/public-files/U9mKr25SUKQfEsl'
-        '/graphology-layout-forceatlas2.js'
+        'jquery.min.js': (
+            'https://code.jquery.com/jquery-3.7.1.min.js',
+            'fc9a93dd241f6b045cbff0481cf4e1901becd0e12fb45166a8f17f95823f0b1a'
+        ),
+        'sigma-base.min.js': (
+            'https://cdnjs.cloudflare.com/ajax/libs'
+            '/sigma.js/3.0.2/sigma.min.js',
+            None
+        ),
+        'sigma-edge-curve.js': (
+            'https://cernbox.cern.ch/remote.php/dav'
+            '/public-files/GN8XhQhKJAfG1yH/sigma-edge-curve.js',
+            None
+        ),
+        'graphology.umd.min.js': (
+            'https://cdnjs.cloudflare.com/ajax/libs'
+            '/graphology/0.26.0/graphology.umd.min.js',
+            None
+        ),
+        'graphology-layout-forceatlas2.js': (
+            'https://cernbox.cern.ch/'
+            'remote.php/dav/public-files/U9mKr25SUKQfEsl'
+            '/graphology-layout-forceatlas2.js',
+            None
+        )
     }
 
     if args.list:
@@ -104,18 +548,29 @@ def main():
 
         return 0
 
-    if args.reinstall_js_deps and args.results is None:
-        for name, url in js_dependencies.items():
-            print(f'Downloading {name} from {url}...',
-                  file=sys.stderr)
+    def install_js_dependencies(force):
+        to_install = {name: dep for name, dep in js_dependencies.items()
+                      if force or not (static_path / name).exists()}
 
-            with urllib.request.urlopen(url) as data:
-                with (static_path / name).open(mode='wb') as f:
-                    shutil.copyfileobj(data, f)
+        if len(to_install) == 0:
+            return True
 
-        return 0
+        objects, errors = _fetch_js_dependencies(
+            list(to_install.values()), js_cache_path, args.js_mirror)
 
-    if args.results is None:
+        for error in errors:
+            print(f'adaptyst-analyser: error: {error}', file=sys.stderr)
+
+        for name, (url, _) in to_install.items():
+            if url in objects:
+                _install_cached_file(objects[url], static_path / name)
+
+        return len(errors) == 0
+
+    if args.reinstall_js_deps and len(args.results) == 0:
+        return 0 if install_js_dependencies(True) else 2
+
+    if len(args.results) == 0:
         print('adaptyst-analyser: error: the following arguments '
               'are required: PATH', file=sys.stderr)
         return 1
@@ -125,21 +580,106 @@ def main():
               file=sys.stderr)
         return 1
 
-    result_path = Path(args.results)
+    result_paths = {}
+    named_results = False
 
-    if not result_path.exists():
-        print(f'adaptyst-analyser: error: {args.results} does not exist',
-              file=sys.stderr)
-        return 1
+    for result in args.results:
+        name, sep, path_str = result.partition('=')
+
+        if len(sep) == 0 or '/' in name:
+            name, path_str = None, result
+        elif re.fullmatch(r'[A-Za-z0-9_.-]+', name) is None:
+            print(f'adaptyst-analyser: error: {name} is not a valid name, '
+                  'use only letters, digits, ".", "_", and "-"',
+                  file=sys.stderr)
+            return 1
+        else:
+            named_results = True
 
-    result_path = result_path.resolve()
+        result_path = Path(path_str)
 
-    if not result_path.is_dir():
-        print(f'adaptyst-analyser: error: {args.results} does not point '
-              'to a directory', file=sys.stderr)
-        return 1
+        if not result_path.exists():
+            print(f'adaptyst-analyser: error: {path_str} does not exist',
+                  file=sys.stderr)
+            return 1
+
+        result_path = result_path.resolve()
+
+        if not result_path.is_dir():
+            print(f'adaptyst-analyser: error: {path_str} does not point '
+                  'to a directory', file=sys.stderr)
+            return 1
+
+        if name is None:
+            base_name = re.sub(r'[^A-Za-z0-9_.-]', '_', result_path.name)
+            name = base_name
+            index = 2
+
+            while name in result_paths:
+                name = f'{base_name}-{index}'
+                index += 1
+        elif name in result_paths:
+            print(f'adaptyst-analyser: error: {name} is used more than '
+                  'once', file=sys.stderr)
+            return 1
+
+        result_paths[name] = str(result_path)
+
+    if args.precompute:
+        module_tokens = {}
+
+        for p in (Path(__file__).parent / 'modules').glob('*/metadata.yml'):
+            with p.open(mode='r') as f:
+                metadata = yaml.safe_load(f)
+
+            module_tokens[p.parent.name] = \
+                f'{p.resolve().parent.name}:{metadata.get("version")}'
+
+        sessions = [(path, x.value) for path in result_paths.values()
+                    for x in PerformanceAnalysisResults.get_all_folders(path)]
+        statuses = defaultdict(int)
+        start = time.monotonic()
+
+        with ProcessPoolExecutor(max_workers=max(1, args.jobs)) as executor:
+            futures = {
+                executor.submit(_precompute_session, path, folder,
+                                module_tokens): (path, folder,
+                                                 time.monotonic())
+                for path, folder in sessions
+            }
+
+            for i, future in enumerate(as_completed(futures)):
+                path, folder, submitted = futures[future]
+
+                try:
+                    status, errors = future.result()
+                except Exception as e:
+                    status, errors = 'failed', [str(e)]
+
+                if len(errors) > 0 and status != 'failed':
+                    status += ' with errors'
+
+                statuses[status] += 1
+                print(f'[{i + 1}/{len(sessions)}] '
+                      f'{str(Path(path) / folder)}: {status} '
+                      f'({time.monotonic() - submitted:.2f} s)',
+                      file=sys.stderr)
+
+                for error in errors:
+                    print(f'adaptyst-analyser: error: {error}',
+                          file=sys.stderr)
+
+        print(f'Processed {len(sessions)} session(s) in '
+              f'{time.monotonic() - start:.2f} s: ' +
+              ', '.join(f'{count} {status}'
+                        for status, count in sorted(statuses.items())),
+              file=sys.stderr)
+
+        return 0 if statuses['failed'] == 0 and \
+            statuses['precomputed with errors'] == 0 else 2
 
-    if (result_path / 'web').exists() and \
+    if len(args.results) == 1 and not named_results and \
+       (result_path / 'web').exists() and \
        (result_path / 'web').is_dir() and \
        (result_path / 'python').exists() and \
        (result_path / 'python').is_dir() and \
@@ -235,34 +775,39 @@ def main():
         analyser_path = Path(import_module('adaptystanalyser').__file__).parent
 
         module_python_path = analyser_path / 'modules' / metadata['name']
-
-        if module_python_path.exists():
-            if args.update:
-                shutil.rmtree(module_python_path)
-            else:
-                print(f'adaptyst-analyser: error: {metadata["name"]} '
-                      'is already installed, use the -u flag',
-                      file=sys.stderr)
-                return 3
-
-        module_python_path.mkdir(parents=True)
-
         module_web_path = analyser_path / 'static' / 'modules' / \
             metadata['name']
         global_deps_path = analyser_path / 'static' / 'deps'
 
-        if module_web_path.exists():
-            if args.update:
-                shutil.rmtree(module_web_path)
-            else:
+        python_store_path = analyser_path / 'modules' / '.store' / \
+            metadata['name']
+        web_store_path = analyser_path / 'static' / 'modules' / '.store' / \
+            metadata['name']
+
+        if module_python_path.exists() or module_web_path.exists():
+            if not args.update:
                 print(f'adaptyst-analyser: error: {metadata["name"]} '
                       'is already installed, use the -u flag',
                       file=sys.stderr)
                 return 3
 
-        module_web_path.mkdir(parents=True)
+        old_manifest = {}
+
+        if (module_python_path / 'manifest.json').exists():
+            with (module_python_path / 'manifest.json').open(mode='r') as f:
+                old_manifest = json.load(f)
+
         global_deps_path.mkdir(parents=True, exist_ok=True)
 
+        # The hashes of installed deps, so that they don't have to be
+        # read again when other modules are installed.
+        deps_record_path = global_deps_path / '.sha256.json'
+        deps_record = {}
+
+        if deps_record_path.exists():
+            with deps_record_path.open(mode='r') as f:
+                deps_record = json.load(f)
+
         def install(item, module_path):
             if item.is_dir():
                 shutil.copytree(item, module_path / item.name,
@@ -316,7 +861,8 @@ def main():
                     if (src_file.is_symlink() and dst_file.is_symlink() and
                         src_file.resolve() == dst_file.resolve()) or \
                         (src_file.is_file() and dst_file.is_file() and
-                         filecmp.cmp(src_file, dst_file, shallow=False)):
+                         _files_equal(src_file, dst_file,
+                                      deps_record.get(item.name))):
                         continue
                     else:
                         answer = ''
@@ -332,65 +878,111 @@ def main():
                             continue
 
                 if args.development:
+                    if (global_deps_path / item.name).is_symlink() or \
+                       (global_deps_path / item.name).exists():
+                        (global_deps_path / item.name).unlink()
+
                     (global_deps_path / item.name).symlink_to(
                         item.resolve())
                 else:
                     install(item, global_deps_path)
 
+                deps_record[item.name] = _record_sha256(
+                    global_deps_path / item.name)
+
+            with NamedTemporaryFile(mode='w', dir=global_deps_path,
+                                    prefix='.', delete=False) as tf:
+                json.dump(deps_record, tf, indent=2, sort_keys=True)
+
+            os.chmod(tf.name, 0o644)
+            os.replace(tf.name, deps_record_path)
+
         if 'js_url_dependencies' in metadata:
-            for url in metadata['js_url_dependencies']:
-                path = Path(urlparse(url).path)
-                dst_file = global_deps_path / path.name
+            url_deps = []
 
-                if path.suffix not in ['.js', '.cjs', '.css']:
+            for dep in metadata['js_url_dependencies']:
+                if isinstance(dep, dict):
+                    url, sha256 = dep['url'], dep.get('sha256')
+                else:
+                    url, sha256 = dep, None
+
+                if Path(urlparse(url).path).suffix not in ['.js', '.cjs',
+                                                           '.css']:
                     print('adaptyst-analyser: warning: '
                           f'skipping URL {url} as it is neither '
                           '.js, .cjs, nor .css', file=sys.stderr)
                     continue
 
-                with urllib.request.urlopen(url) as data:
-                    with NamedTemporaryFile(delete=False) as tf:
-                        shutil.copyfileobj(data, tf)
-                        tf_path = Path(tf.name)
-
-                    if dst_file.exists() and \
-                       (dst_file.is_symlink() or
-                       not filecmp.cmp(tf_path, dst_file, shallow=False)):
-                        answer = ''
-                        while answer not in ['Y', 'y', 'N', 'n']:
-                            answer = \
-                                input(f'{str(dst_file)} already exists '
-                                      'and is different than the file '
-                                      'from the module you are '
-                                      'installing. Do you want to replace '
-                                      'the destination file? [Y/N] ')
-
-                        if answer in ['N', 'n']:
-                            tf_path.unlink()
-                            continue
-
-                    if (global_deps_path / path.name).exists():
-                        (global_deps_path / path.name).unlink()
-
-                    shutil.copy2(tf_path, global_deps_path / path.name)
-                    tf_path.unlink()
+                url_deps.append((url, sha256))
 
-        for item in web_path.iterdir():
-            if item.name == 'deps':
-                continue
+            objects, errors = _fetch_js_dependencies(url_deps,
+                                                     js_cache_path,
+                                                     args.js_mirror)
 
-            if args.development:
-                (module_web_path / item.name).symlink_to(item.resolve())
-            else:
-                install(item, module_web_path)
+            if len(errors) > 0:
+                for error in errors:
+                    print(f'adaptyst-analyser: error: {error}',
+                          file=sys.stderr)
+                return 2
 
-        for item in python_path.iterdir():
-            if args.development:
-                (module_python_path / item.name).symlink_to(item.resolve())
-            else:
-                install(item, module_python_path)
+            for url, _ in url_deps:
+                obj_path = objects[url]
+                dst_file = global_deps_path / Path(urlparse(url).path).name
+
+                if dst_file.exists() and \
+                   (dst_file.is_symlink() or
+                   _sha256_file(dst_file) != obj_path.name):
+                    answer = ''
+                    while answer not in ['Y', 'y', 'N', 'n']:
+                        answer = \
+                            input(f'{str(dst_file)} already exists '
+                                  'and is different than the file '
+                                  'from the module you are '
+                                  'installing. Do you want to replace '
+                                  'the destination file? [Y/N] ')
+
+                    if answer in ['N', 'n']:
+                        continue
 
-        install(metadata_path, module_python_path)
+                _install_cached_file(obj_path, dst_file)
+
+        manifest, sources = _scan_module(
+            {'python': sorted(python_path.iterdir()) + [metadata_path],
+             'web': sorted(filter(lambda x: x.name != 'deps',
+                                  web_path.iterdir()))},
+            old_manifest.get('files', {}), args.development)
+        if old_manifest.get('digest') == manifest['digest'] and \
+           module_python_path.is_symlink() and \
+           module_web_path.is_symlink() and \
+           module_python_path.resolve().name == \
+           module_web_path.resolve().name:
+            print(f'adaptyst-analyser: {metadata["name"]} '
+                  'is already up to date')
+            return 0
+
+        index = 0
+        tree_name = f'{manifest["digest"][:16]}-{index}'
+
+        while (python_store_path / tree_name).exists() or \
+                (web_store_path / tree_name).exists():
+            index += 1
+            tree_name = f'{manifest["digest"][:16]}-{index}'
+
+        _materialise_module(manifest, sources, old_manifest,
+                            {'python': module_python_path,
+                             'web': module_web_path},
+                            {'python': python_store_path / tree_name,
+                             'web': web_store_path / tree_name})
+
+        with (python_store_path / tree_name / 'manifest.json').open(
+                mode='w') as f:
+            json.dump(manifest, f, indent=2, sort_keys=True)
+
+        # The web tree is swapped first so that the new Python code is
+        # never served alongside the old web code.
+        _activate_module_tree(module_web_path, web_store_path, tree_name)
+        _activate_module_tree(module_python_path, python_store_path,
+                              tree_name)
 
         print(f'adaptyst-analyser: {metadata["name"]} '
               'installed successfully')
@@ -404,7 +996,8 @@ def main():
 
         if module_path.exists():
             modules = list(map(lambda x: x.name,
-                               module_path.glob('*')))
+                               filter(lambda x: not x.name.startswith('.'),
+                                      module_path.glob('*'))))
 
             if len(modules) > 0:
                 print(f'Modules installed: {modules}', file=sys.stderr)
@@ -413,24 +1006,36 @@ def main():
         else:
             print('No modules installed')
 
-        for name, url in js_dependencies.items():
-            if args.reinstall_js_deps or not (static_path / name).exists():
-                print(f'Downloading {name} from {url}...',
-                      file=sys.stderr)
+        if not install_js_dependencies(args.reinstall_js_deps):
+            return 2
 
-                with urllib.request.urlopen(url) as data:
-                    with (static_path / name).open(mode='wb') as f:
-                        shutil.copyfileobj(data, f)
+        if args.workers < 1 or args.threads < 1 or \
+           args.reserved_threads < 0:
+            print('adaptyst-analyser: error: -w and --threads must be '
+                  'positive and --reserved-threads must not be negative',
+                  file=sys.stderr)
+            return 1
 
         env = os.environ.copy()
         env.update({
-            'FLASK_PERFORMANCE_ANALYSIS_STORAGE': str(result_path),
+            'FLASK_PERFORMANCE_ANALYSIS_STORAGE':
+            str(result_path) if len(args.results) == 1 and
+            not named_results else json.dumps(result_paths),
+            'FLASK_STORAGE_TIMEOUT': str(args.storage_timeout),
             'FLASK_CUSTOM_TITLE': args.title,
-            'FLASK_BACKGROUND_CSS': args.background
+            'FLASK_BACKGROUND_CSS': args.background,
+            'FLASK_MODULE_WORKER_CAPACITY': str(
+                max(1, args.threads - args.reserved_threads))
         })
 
+        if args.module_timeout is not None:
+            env['FLASK_MODULE_TIMEOUT'] = str(args.module_timeout)
+
         try:
             return subprocess.run(['gunicorn', '-b', args.address,
+                                   '-w', str(args.workers),
+                                   '-k', 'gthread',
+                                   '--threads', str(args.threads),
                                    'adaptystanalyser.app:app'],
                                   env=env).returncode
         except KeyboardInterrupt:
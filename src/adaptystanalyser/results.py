@@ -3,10 +3,170 @@
 
 import json
 import yaml
+import csv
+import mmap
 import random
 import html
+import hashlib
+import os
+import math
+import threading
+import time
 from pathlib import Path
-from collections import defaultdict
+from collections import defaultdict, OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait
+from .timing import phase
+
+
+def _compute_layout(nodes, edges, iterations=50, size=40, gravity=100):
+    """
+    Compute the positions of graph nodes with the same ForceAtlas2
+    variant as the one run on the client side (sizes adjusted,
+    no Barnes-Hut approximation).
+
+    :param list nodes: The list of node keys.
+    :param list edges: The list of (source key, target key) tuples.
+    :return: The dictionary mapping node keys to (x, y) tuples.
+    """
+    rng = random.Random(0)
+    x = {n: rng.random() for n in nodes}
+    y = {n: rng.random() for n in nodes}
+    mass = {n: 1 for n in nodes}
+    old_dx = {n: 0 for n in nodes}
+    old_dy = {n: 0 for n in nodes}
+
+    for source, target in edges:
+        mass[source] += 1
+        mass[target] += 1
+
+    for _ in range(iterations):
+        dx = {n: 0 for n in nodes}
+        dy = {n: 0 for n in nodes}
+
+        for i, n1 in enumerate(nodes):
+            for n2 in nodes[:i]:
+                x_dist, y_dist = x[n1] - x[n2], y[n1] - y[n2]
+                distance = math.hypot(x_dist, y_dist) - 2 * size
+
+                if distance > 0:
+                    factor = mass[n1] * mass[n2] / distance / distance
+                elif distance < 0:
+                    factor = 100 * mass[n1] * mass[n2]
+                else:
+                    continue
+
+                dx[n1] += x_dist * factor
+                dy[n1] += y_dist * factor
+                dx[n2] -= x_dist * factor
+                dy[n2] -= y_dist * factor
+
+        for n in nodes:
+            distance = math.hypot(x[n], y[n])
+
+            if distance > 0:
+                factor = mass[n] * gravity / distance
+                dx[n] -= x[n] * factor
+                dy[n] -= y[n] * factor
+
+        for source, target in edges:
+            x_dist, y_dist = x[source] - x[target], y[source] - y[target]
+
+            if math.hypot(x_dist, y_dist) - 2 * size > 0:
+                dx[source] -= x_dist
+                dy[source] -= y_dist
+                dx[target] += x_dist
+                dy[target] += y_dist
+
+        for n in nodes:
+            force = math.hypot(dx[n], dy[n])
+
+            if force > 10:
+                dx[n] = dx[n] * 10 / force
+                dy[n] = dy[n] * 10 / force
+
+            swinging = mass[n] * math.hypot(old_dx[n] - dx[n],
+                                            old_dy[n] - dy[n])
+            traction = math.hypot(old_dx[n] + dx[n], old_dy[n] + dy[n]) / 2
+            speed = 0.1 * math.log(1 + traction) / (1 + math.sqrt(swinging))
+
+            x[n] += dx[n] * speed
+            y[n] += dy[n] * speed
+
+        old_dx, old_dy = dx, dy
+
+    return {n: (x[n], y[n]) for n in nodes}
+
+
+def _update_tree_digest(digest, path):
+    # Hashes the relative paths, modification times, and sizes of
+    # everything inside a directory, without reading any file.
+    stack = [path]
+
+    while len(stack) > 0:
+        current = stack.pop()
+
+        with os.scandir(current) as it:
+            entries = sorted(it, key=lambda x: x.name)
+
+        for entry in entries:
+            try:
+                stat = entry.stat(follow_symlinks=False)
+            except FileNotFoundError:
+                continue
+
+            rel = os.path.relpath(entry.path, path)
+            digest.update(f'{rel}:{stat.st_mtime_ns}:'
+                          f'{stat.st_size};'.encode())
+
+            if entry.is_dir(follow_symlinks=False):
+                stack.append(entry.path)
+
+
+def _get_fingerprint(path):
+    # Hashes the modification times and sizes of the files parsed by
+    # PerformanceAnalysisResults.
+    digest = hashlib.sha1()
+    paths = [path / 'dirmeta.json',
+             path / 'entity_colours.json',
+             path / 'system' / 'system.yml'] + \
+        sorted((path / 'system').glob('*/dirmeta.json')) + \
+        sorted((path / 'system').glob('*/*/*/dirmeta.json'))
+
+    # Relative paths keep the fingerprint valid when the session is
+    # seen under another mount point.
+    for item in paths:
+        rel = item.relative_to(path).as_posix()
+
+        try:
+            stat = item.stat()
+            digest.update(f'{rel}:{stat.st_mtime_ns}:'
+                          f'{stat.st_size};'.encode())
+        except FileNotFoundError:
+            digest.update(f'{rel}:-;'.encode())
+
+    return digest.hexdigest()
+
+
+def _get_session_version(path):
+    digest = hashlib.sha1()
+
+    for item in [path, path / 'system']:
+        stat = item.stat()
+        digest.update(f'{stat.st_mtime_ns}:{stat.st_size};'.encode())
+
+    for item in [path / 'dirmeta.json', path / 'entity_colours.json',
+                 path / PerformanceAnalysisResults.CACHE_FILE]:
+        try:
+            stat = item.stat()
+            digest.update(f'{item.name}:{stat.st_mtime_ns}:'
+                          f'{stat.st_size};'.encode())
+        except FileNotFoundError:
+            digest.update(f'{item.name}:-;'.encode())
+
+    with phase('fs', 'Session metadata reads'):
+        _update_tree_digest(digest, path / 'system')
+
+    return digest.hexdigest()
 
 
 class Identifier:
@@ -14,12 +174,15 @@ class Identifier:
     A class representing a performance analysis session identifier.
     """
 
-    def __init__(self, result: Path):
+    def __init__(self, result: Path, namespace: str = None):
         """
         Construct an Identifier object, checking the correctness
         of the supplied result folder.
 
         :param pathlib.Path result: A performance analysis session folder.
+        :param str namespace: The name of the results directory the folder
+                              is in, to be prepended to the identifier
+                              value (see FederatedStorage). It can be None.
         :raises ValueError: When a provided folder doesn't exist or is incorrect.
         """
         if not (result / 'dirmeta.json').exists():
@@ -68,7 +231,12 @@ class Identifier:
         else:
             self._second = str(self._second)
 
-        self._id_str = result.name
+        self._namespace = namespace
+
+        if namespace is None:
+            self._id_str = result.name
+        else:
+            self._id_str = namespace + FederatedStorage.SEPARATOR + result.name
 
     def __str__(self):
         """
@@ -77,7 +245,8 @@ class Identifier:
         """
         return f'{self._label} (' \
             f'{self._year}-{self._month}-{self._day} ' \
-            f'{self._hour}:{self._minute}:{self._second})'
+            f'{self._hour}:{self._minute}:{self._second})' + \
+            ('' if self._namespace is None else f' [{self._namespace}]')
 
     @property
     def label(self):
@@ -110,10 +279,18 @@ class Identifier:
 
         return None
 
+    @property
+    def namespace(self):
+        return self._namespace
+
     @property
     def value(self):
         return self._id_str
 
+    def sort_key(self):
+        return (-self.year, -self.month, -self.day, -self.hour,
+                -self.minute, -self.second, self.label)
+
     def __eq__(self, other):
         return self.value == other.value
 
@@ -121,19 +298,211 @@ class Identifier:
         return hash(self.value)
 
 
+class FederatedStorage:
+    """
+    A class presenting one or more performance analysis results
+    directories ("roots") as a single storage.
+
+    If there is more than one root, session identifiers are
+    namespaced as "<root name>~<folder>". Roots are scanned in parallel
+    and a root which doesn't finish scanning within a timeout is
+    reported as unavailable and skipped until its scan completes, so
+    a slow mount doesn't stall the others. A single root is always
+    waited for.
+    """
+
+    SEPARATOR = '~'
+
+    def __init__(self, roots, timeout: float = 5):
+        """
+        Construct a FederatedStorage object.
+
+        :param roots: The path string to a single performance analysis
+                      results directory or the dictionary mapping root
+                      names to such path strings.
+        :type roots: str or dict
+        :param float timeout: The maximum time in seconds to wait for
+                              the scan of roots in get_all_folders()
+                              if there is more than one root.
+        """
+        if isinstance(roots, dict):
+            for name in roots.keys():
+                if FederatedStorage.SEPARATOR in name:
+                    raise ValueError(f'Invalid root name: {name}')
+
+            self._roots = dict(roots)
+            self._namespaced = True
+        else:
+            self._roots = {'': str(roots)}
+            self._namespaced = False
+
+        self._timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=len(self._roots))
+        self._lock = threading.Lock()
+        self._scans = {}
+        self._folders = {name: [] for name in self._roots.keys()}
+        self._health = {name: {'available': None, 'error': None,
+                               'scan_time': None}
+                        for name in self._roots.keys()}
+
+    def _scan(self, name):
+        start = time.monotonic()
+
+        try:
+            folders = PerformanceAnalysisResults.get_all_folders(
+                self._roots[name], name if self._namespaced else None)
+            error = None
+        except OSError as e:
+            folders = None
+            error = str(e)
+
+        with self._lock:
+            if folders is not None:
+                self._folders[name] = folders
+
+            self._health[name] = {'available': error is None,
+                                  'error': error,
+                                  'scan_time': time.monotonic() - start}
+
+    def get_all_folders(self) -> list:
+        """
+        Get the folders of all performance analysis sessions stored in
+        all roots. Roots that are still being scanned after the timeout
+        contribute the result of their last completed scan (if any).
+        Only the scans started by this call are waited for, roots whose
+        scans are still running since an earlier call are reported as
+        unavailable immediately. If there is only one root, its scan is
+        always waited for, without any timeout.
+
+        :return: The list of Identifier objects.
+        """
+        submitted = {}
+
+        with self._lock:
+            for name in self._roots.keys():
+                if name in self._scans and not self._scans[name].done():
+                    if not self._namespaced:
+                        # There is nothing else to list, so a single root
+                        # is waited for even if its scan started earlier.
+                        submitted[name] = self._scans[name]
+                        continue
+
+                    # A root still being scanned since an earlier call
+                    # is not waited for again.
+                    self._health[name] = {
+                        'available': False,
+                        'error': 'scan timed out',
+                        'scan_time': None
+                    }
+                else:
+                    submitted[name] = self._executor.submit(self._scan, name)
+                    self._scans[name] = submitted[name]
+
+        _, pending = wait(submitted.values(),
+                          timeout=self._timeout if self._namespaced else None)
+
+        with self._lock:
+            for name, scan in submitted.items():
+                if scan in pending and not scan.done():
+                    self._health[name] = {
+                        'available': False,
+                        'error': 'scan timed out',
+                        'scan_time': None
+                    }
+
+            ids = [x for folders in self._folders.values() for x in folders]
+
+        return list(sorted(ids, key=Identifier.sort_key))
+
+    def get_health(self) -> dict:
+        """
+        Get the status of all roots as of the last call to
+        get_all_folders().
+
+        :return: The dictionary mapping root names to dictionaries with
+                 "available" (bool or None if never scanned), "error"
+                 (str or None), and "scan_time" (float in seconds or None)
+                 keys.
+        """
+        with self._lock:
+            return {name: dict(health)
+                    for name, health in self._health.items()}
+
+    def resolve(self, identifier: str) -> tuple:
+        """
+        Find the results directory and the session folder corresponding
+        to a session identifier, without scanning any root.
+
+        :param str identifier: The session identifier.
+        :raises ValueError: When the identifier doesn't point to any root.
+        :return: The tuple of the path string to the results directory
+                 and the folder of the session inside it.
+        """
+        if not self._namespaced:
+            return self._roots[''], identifier
+
+        name, sep, folder = identifier.partition(FederatedStorage.SEPARATOR)
+
+        if len(sep) == 0 or name not in self._roots:
+            raise ValueError(f'{identifier} does not point to any '
+                             'results directory!')
+
+        return self._roots[name], folder
+
+
+class SessionFile:
+    """
+    A class representing a file (or its byte range) from a performance
+    analysis session folder to be sent to the client side as is.
+
+    A module can return a SessionFile object from process() instead
+    of reading the file itself. Adaptyst Analyser will then stream
+    the file directly from disk, with support for HTTP range requests.
+    """
+
+    def __init__(self, path, start: int = 0, length: int = None,
+                 mimetype: str = None, download_name: str = None):
+        """
+        Construct a SessionFile object.
+
+        :param path: The path to the file. It must be inside the
+                     performance analysis session folder the request is
+                     about.
+        :type path: str or pathlib.Path
+        :param int start: The offset of the first byte to serve.
+        :param int length: The number of bytes to serve. If None,
+                           everything up to the end of the file is served.
+        :param str mimetype: The MIME type of the content. If None, it is
+                             guessed from the file name.
+        :param str download_name: The name to suggest to the browser for
+                                  saving the file. If None, the content is
+                                  sent inline.
+        """
+        self.path = Path(path)
+        self.start = start
+        self.length = length
+        self.mimetype = mimetype
+        self.download_name = download_name
+
+
 class PerformanceAnalysisResults:
     """
     A class describing the results of a specific performance analysis
     session stored inside a given results directory.
     """
 
-    def get_all_folders(path_str: str) -> list:
+    CACHE_FILE = 'analyser_cache.json'
+    CACHE_FORMAT = 1
+
+    def get_all_folders(path_str: str, namespace: str = None) -> list:
         """
         Get the folders of all performance analysis sessions stored in
         a given results directory.
 
         :param str path_str: The path string to a performance analysis
                              results directory.
+        :param str namespace: The namespace of the returned identifiers
+                              (see Identifier). It can be None.
         :return: The list of folders that can be used
                  for constructing a PerformanceAnalysisResults object.
         """
@@ -142,19 +511,41 @@ class PerformanceAnalysisResults:
 
         for x in filter(Path.is_dir, path.glob('*')):
             try:
-                identifier = Identifier(x)
+                identifier = Identifier(x, namespace)
             except ValueError:
                 continue
 
             ids.append(identifier)
 
-        return list(sorted(ids, key=lambda x: (-x.year,
-                                               -x.month,
-                                               -x.day,
-                                               -x.hour,
-                                               -x.minute,
-                                               -x.second,
-                                               x.label)))
+        return list(sorted(ids, key=Identifier.sort_key))
+
+    @staticmethod
+    def get_module_path(performance_analysis_storage: str, folder: str,
+                        entity: str, node: str, module: str) -> Path:
+        """
+        Get the path to the data saved by a module for a given node
+        of a given entity in a performance analysis session, without
+        loading the session.
+
+        :param str performance_analysis_storage: The path string to a
+                                                 performance analysis
+                                                 results directory.
+        :param str folder: The folder of a performance analysis session
+                           stored inside the results directory.
+        :param str entity: The ID of an entity.
+        :param str node: The ID of a node.
+        :param str module: The name of a module.
+        :raises ValueError: When any of the components would point
+                            outside the session folder.
+        :return: The path to the module data directory.
+        """
+        for component in [folder, entity, node, module]:
+            if component in ['', '.', '..'] or '/' in component or \
+               '\0' in component:
+                raise ValueError(f'Invalid path component: {component}')
+
+        return Path(performance_analysis_storage) / folder / 'system' / \
+            entity / node / module
 
     def __init__(self, performance_analysis_storage: str, folder: str):
         """
@@ -169,11 +560,27 @@ class PerformanceAnalysisResults:
                            valid folders.
         """
         self._path = Path(performance_analysis_storage) / folder
-        self._identifier = Identifier(self._path)
+        with phase('fs', 'Session metadata reads'):
+            self._identifier = Identifier(self._path)
+
+        self._graph = None
+        self._precomputed_modules = {}
+
+        with phase('cache', 'Precomputed cache lookup'):
+            loaded = self._load_cache()
+
+        if not loaded:
+            self._load()
 
-        with (self._path / 'system' / 'system.yml').open(mode='r') as f:
+    def _load(self):
+        with phase('yaml', 'System YAML parsing'), \
+             (self._path / 'system' / 'system.yml').open(mode='r') as f:
             self._system = yaml.safe_load(f)
 
+        with phase('fs', 'Session metadata reads'):
+            self._load_metadata()
+
+    def _load_metadata(self):
         self._used_module_vers = defaultdict(lambda: defaultdict(dict))
 
         for entity_name, entity in self._system['entities'].items():
@@ -216,6 +623,130 @@ class PerformanceAnalysisResults:
             self._entity_exit_codes[entity_dir.name] = \
                 metadata.get('exit_code', -1)
 
+    def _get_fingerprint(self):
+        return _get_fingerprint(self._path)
+
+    def _load_cache(self):
+        cache_path = self._path / PerformanceAnalysisResults.CACHE_FILE
+
+        try:
+            with cache_path.open(mode='r') as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            return False
+
+        if cache.get('format') != PerformanceAnalysisResults.CACHE_FORMAT or \
+           cache.get('fingerprint') != self._get_fingerprint():
+            return False
+
+        self._system = cache['system']
+        self._used_module_vers = defaultdict(lambda: defaultdict(dict))
+
+        for entity, nodes in cache['used_module_vers'].items():
+            for node, vers in nodes.items():
+                self._used_module_vers[entity][node].update(vers)
+
+        self._entity_colours = cache['entity_colours']
+        self._entity_exit_codes = cache['entity_exit_codes']
+        self._graph = cache['graph']
+        self._precomputed_modules = cache['modules']
+
+        return True
+
+    def get_node_modules(self) -> list:
+        """
+        Get all modules used by the nodes of the session.
+
+        :return: The list of (entity ID, node ID, module name) tuples.
+        """
+        return [(entity_name, node, mod['name'])
+                for entity_name, entity in self._system['entities'].items()
+                for node, settings in entity['nodes'].items()
+                for mod in settings['modules']]
+
+    def get_precomputed_modules(self) -> dict:
+        """
+        Get the modules whose precompute() hooks have been run for
+        the session, along with the tokens passed to precompute().
+
+        :return: The dictionary mapping module names to their tokens or
+                 None if the session hasn't been precomputed or
+                 the precomputed data are out of date.
+        """
+        if self._graph is None:
+            return None
+
+        return dict(self._precomputed_modules)
+
+    def precompute(self, modules: dict = None):
+        """
+        Compute everything needed for serving the session (parsed
+        metadata, entity colours, and the system graph with its layout)
+        and save it inside the session folder, so that subsequently
+        constructed PerformanceAnalysisResults objects can load it
+        instead of parsing the session files.
+
+        :param dict modules: The dictionary mapping the names of modules
+                             whose caches have been precomputed to
+                             arbitrary tokens identifying the module
+                             versions, to be returned later by
+                             get_precomputed_modules(). It can be
+                             None.
+        """
+        if modules is None:
+            modules = {}
+
+        self._graph = None
+        graph = json.loads(self.get_system_graph())
+        positions = _compute_layout(
+            [node['key'] for node in graph['system']['nodes']],
+            [(edge['source'], edge['target'])
+             for edge in graph['system']['edges']])
+
+        for node in graph['system']['nodes']:
+            node['attributes']['x'], node['attributes']['y'] = \
+                positions[node['key']]
+
+        graph['layout'] = True
+
+        cache = {
+            'format': PerformanceAnalysisResults.CACHE_FORMAT,
+            'fingerprint': self._get_fingerprint(),
+            'system': self._system,
+            'used_module_vers': self._used_module_vers,
+            'entity_colours': self._entity_colours,
+            'entity_exit_codes': self._entity_exit_codes,
+            'graph': json.dumps(graph),
+            'modules': modules
+        }
+
+        cache_path = self._path / PerformanceAnalysisResults.CACHE_FILE
+        tmp_path = self._path / f'.{cache_path.name}.{os.getpid()}'
+
+        with tmp_path.open(mode='w') as f:
+            json.dump(cache, f)
+
+        os.replace(tmp_path, cache_path)
+
+        self._graph = cache['graph']
+        self._precomputed_modules = modules
+
+    @property
+    def path(self):
+        return self._path
+
+    def get_version(self) -> str:
+        """
+        Get a token identifying the current state of the performance
+        analysis session on disk. The token changes whenever the session
+        metadata, the precomputed cache, or any file inside the "system"
+        directory (including the data saved by modules) is added, removed,
+        or modified.
+
+        :return: The version token.
+        """
+        return _get_session_version(self._path)
+
     def _set_entity_colour(self, entity, colour):
         self._entity_colours[entity] = colour
 
@@ -223,6 +754,9 @@ class PerformanceAnalysisResults:
             f.write(json.dumps(self._entity_colours))
 
     def get_system_graph(self):
+        if self._graph is not None:
+            return self._graph
+
         used_colours = set()
         entities = {}
 
@@ -303,3 +837,256 @@ class PerformanceAnalysisResults:
                 ]
             }
         })
+
+
+class SessionDataReader:
+    """
+    A class giving modules fast access to the files of a performance
+    analysis session, built on top of PerformanceAnalysisResults.
+
+    Parsed JSON, YAML, and CSV files are cached per process and shared
+    between all readers. A cached value is invalidated when the
+    modification time or size of its file changes, and the least recently
+    used values are evicted when the total size of the cached files
+    exceeds SessionDataReader.memory_budget bytes.
+
+    Readers returned by get() are kept for at most
+    SessionDataReader.reader_limit most recently used sessions.
+
+    Cached values are shared, so they must not be modified.
+    """
+
+    memory_budget = 256 * 1024 * 1024
+    reader_limit = 32
+    version_ttl = 2
+
+    _lock = threading.Lock()
+    _cache = OrderedDict()
+    _cache_size = 0
+    _readers = OrderedDict()
+
+    @staticmethod
+    def _get_token(path):
+        # The readers depend only on the files parsed by
+        # PerformanceAnalysisResults and on the precomputed cache.
+        digest = hashlib.sha1(_get_fingerprint(path).encode())
+
+        try:
+            stat = (path / PerformanceAnalysisResults.CACHE_FILE).stat()
+            digest.update(f'{stat.st_mtime_ns}:{stat.st_size}'.encode())
+        except FileNotFoundError:
+            digest.update(b'-')
+
+        return digest.hexdigest()
+
+    @classmethod
+    def get(cls, performance_analysis_storage: str, folder: str):
+        """
+        Get a reader for a performance analysis session, reusing
+        the previous one if the session metadata haven't changed since
+        then.
+
+        :param str performance_analysis_storage: The path string to a
+                                                 performance analysis
+                                                 results directory.
+        :param str folder: The folder of a performance analysis session
+                           stored inside the results directory.
+        :raises ValueError: When the session folder is incorrect.
+        :return: The SessionDataReader object.
+        """
+        key = (str(performance_analysis_storage), folder)
+
+        # The token is taken before loading the session, so that
+        # changes made while loading are picked up next time.
+        token = cls._get_token(Path(performance_analysis_storage) / folder)
+
+        with cls._lock:
+            reader = cls._readers.get(key)
+
+            if reader is not None and reader._token == token:
+                cls._readers.move_to_end(key)
+                return reader
+
+        reader = cls(PerformanceAnalysisResults(performance_analysis_storage,
+                                                folder), token)
+
+        with cls._lock:
+            cls._readers[key] = reader
+            cls._readers.move_to_end(key)
+
+            while len(cls._readers) > cls.reader_limit:
+                cls._readers.popitem(last=False)
+
+        return reader
+
+    @classmethod
+    def clear_cache(cls):
+        """
+        Remove all parsed files from the cache.
+        """
+        with cls._lock:
+            cls._cache.clear()
+            cls._cache_size = 0
+
+    def __init__(self, results: PerformanceAnalysisResults,
+                 token: str = None):
+        """
+        Construct a SessionDataReader object. Use get() instead if you
+        want to reuse readers between requests.
+
+        :param PerformanceAnalysisResults results: The session to read.
+        :param str token: The token identifying the state of the session
+                          metadata taken before constructing the results
+                          object. If None, it is taken now.
+        """
+        self._results = results
+        self._token = SessionDataReader._get_token(results.path) \
+            if token is None else token
+        self._version = None
+
+    @property
+    def results(self):
+        return self._results
+
+    def get_version(self) -> str:
+        """
+        Get the version token of the session, see
+        PerformanceAnalysisResults.get_version(). As computing it
+        involves scanning all session files, the token is reused for
+        SessionDataReader.version_ttl seconds.
+
+        :return: The version token.
+        """
+        now = time.monotonic()
+        version = self._version
+
+        if version is None or \
+           now - version[1] >= SessionDataReader.version_ttl:
+            version = (self._results.get_version(), now)
+            self._version = version
+
+        return version[0]
+
+    def get_module_path(self, entity: str, node: str, module: str) -> Path:
+        """
+        Get the path to the data saved by a module for a given node
+        of a given entity.
+
+        :param str entity: The ID of an entity.
+        :param str node: The ID of a node.
+        :param str module: The name of a module.
+        :raises ValueError: When any of the IDs is invalid.
+        :return: The path to the module data directory.
+        """
+        return PerformanceAnalysisResults.get_module_path(
+            self._results.path.parent, self._results.path.name,
+            entity, node, module)
+
+    def get_file_path(self, entity: str, node: str, module: str,
+                      name: str) -> Path:
+        """
+        Get the path to a file saved by a module for a given node
+        of a given entity.
+
+        :param str entity: The ID of an entity.
+        :param str node: The ID of a node.
+        :param str module: The name of a module.
+        :param str name: The path of the file relative to the module
+                         data directory.
+        :raises ValueError: When the file would be outside the module
+                            data directory.
+        :return: The path to the file.
+        """
+        module_path = self.get_module_path(entity, node, module)
+        path = module_path / name
+
+        try:
+            path.resolve().relative_to(module_path.resolve())
+        except ValueError:
+            raise ValueError(f'{name} is outside the module data directory!')
+
+        return path
+
+    def open_mmap(self, entity: str, node: str, module: str,
+                  name: str) -> mmap.mmap:
+        """
+        Map a file saved by a module into memory, read-only. The returned
+        object can be used as a context manager.
+
+        :param str entity: The ID of an entity.
+        :param str node: The ID of a node.
+        :param str module: The name of a module.
+        :param str name: The path of the file relative to the module
+                         data directory.
+        :raises ValueError: When the file is empty or outside the module
+                            data directory.
+        :return: The mmap.mmap object.
+        """
+        with self.get_file_path(entity, node, module, name).open(
+                mode='rb') as f:
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def load_json(self, entity: str, node: str, module: str, name: str):
+        """
+        Load a JSON file saved by a module, using the cache if possible.
+
+        See get_file_path() for the description of the parameters.
+        """
+        return self._load(self.get_file_path(entity, node, module, name),
+                          'json', json.load)
+
+    def load_yaml(self, entity: str, node: str, module: str, name: str):
+        """
+        Load a YAML file saved by a module, using the cache if possible.
+
+        See get_file_path() for the description of the parameters.
+        """
+        return self._load(self.get_file_path(entity, node, module, name),
+                          'yaml', yaml.safe_load)
+
+    def load_csv(self, entity: str, node: str, module: str, name: str,
+                 **fmtparams) -> list:
+        """
+        Load a CSV file saved by a module as a list of rows, using
+        the cache if possible.
+
+        See get_file_path() for the description of the parameters.
+        Any keyword arguments are passed to csv.reader().
+        """
+        return self._load(self.get_file_path(entity, node, module, name),
+                          ('csv', tuple(sorted(fmtparams.items()))),
+                          lambda f: list(csv.reader(f, **fmtparams)),
+                          newline='')
+
+    def _load(self, path, kind, parse, newline=None):
+        cls = SessionDataReader
+        stat = path.stat()
+        key = (str(path), kind)
+
+        with cls._lock:
+            entry = cls._cache.get(key)
+
+            if entry is not None and entry[0] == stat.st_mtime_ns and \
+               entry[1] == stat.st_size:
+                cls._cache.move_to_end(key)
+                return entry[2]
+
+        with phase('data', 'Module data parsing'), \
+             path.open(mode='r', newline=newline) as f:
+            value = parse(f)
+
+        with cls._lock:
+            old = cls._cache.pop(key, None)
+
+            if old is not None:
+                cls._cache_size -= old[1]
+
+            if stat.st_size <= cls.memory_budget:
+                cls._cache[key] = (stat.st_mtime_ns, stat.st_size, value)
+                cls._cache_size += stat.st_size
+
+                while cls._cache_size > cls.memory_budget:
+                    _, evicted = cls._cache.popitem(last=False)
+                    cls._cache_size -= evicted[1]
+
+        return value
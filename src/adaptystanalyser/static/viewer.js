@@ -13,6 +13,30 @@ class Session {
      */
     static instances = {};
 
+    // Private, not meant to be used by any external code.
+    static #in_flight = {};
+
+    // Private, not meant to be used by any external code.
+    static #memory_cache = new Map();
+
+    // Private, not meant to be used by any external code.
+    static #memory_cache_limit = 100;
+
+    // Private, not meant to be used by any external code.
+    static #db_cache_limit = 500;
+
+    // Private, not meant to be used by any external code.
+    static #db = undefined;
+
+    // Private, not meant to be used by any external code.
+    static #cacheable_types = ['json', 'text', 'html'];
+
+    // Private, not meant to be used by any external code.
+    static #max_retries = 5;
+
+    // Private, not meant to be used by any external code.
+    static #max_retry_delay = 10;
+
     /**
      *  Constructs a Session object, which is the main
      *  place for storing all information about a performance
@@ -26,9 +50,143 @@ class Session {
         this.id = id;
         this.label = label;
         this.modules_loaded = {};
+        this.version = undefined;
         Session.instances[id] = this;
     }
 
+    /**
+     *  Removes all server responses cached by `sendRequest()`,
+     *  both from memory and from IndexedDB.
+     *
+     *  @static
+     */
+    static clearCache() {
+        Session.#memory_cache.clear();
+        Session.#openDB().then(db => {
+            if (db !== undefined) {
+                db.transaction('responses', 'readwrite')
+                    .objectStore('responses').clear();
+            }
+        }).catch(() => {});
+    }
+
+    // Private, not meant to be called by any external code.
+    static #openDB() {
+        if (Session.#db === undefined) {
+            Session.#db = new Promise(resolve => {
+                try {
+                    let request = indexedDB.open('adaptyst-analyser', 1);
+                    request.onupgradeneeded = () => {
+                        let store = request.result.createObjectStore(
+                            'responses', {keyPath: 'key'});
+                        store.createIndex('used', 'used');
+                    };
+                    request.onsuccess = () => {
+                        let db = request.result;
+                        let forget = () => {
+                            db.close();
+                            Session.#db = undefined;
+                        };
+
+                        // Connections closed by the browser or blocking
+                        // a newer version are reopened on next use.
+                        db.onclose = forget;
+                        db.onversionchange = forget;
+                        resolve(db);
+                    };
+                    request.onerror = () => resolve(undefined);
+                } catch (e) {
+                    resolve(undefined);
+                }
+            });
+        }
+
+        return Session.#db;
+    }
+
+    // Private, not meant to be called by any external code.
+    static #rememberInMemory(entry) {
+        Session.#memory_cache.delete(entry.key);
+        Session.#memory_cache.set(entry.key, entry);
+
+        while (Session.#memory_cache.size > Session.#memory_cache_limit) {
+            Session.#memory_cache.delete(
+                Session.#memory_cache.keys().next().value);
+        }
+    }
+
+    // Private, not meant to be called by any external code.
+    static #getCached(key) {
+        if (Session.#memory_cache.has(key)) {
+            let entry = Session.#memory_cache.get(key);
+            Session.#rememberInMemory(entry);
+            return Promise.resolve(entry);
+        }
+
+        return Session.#openDB().then(db => new Promise(resolve => {
+            if (db === undefined) {
+                resolve(undefined);
+                return;
+            }
+
+            let request = db.transaction('responses', 'readonly')
+                .objectStore('responses').get(key);
+            request.onsuccess = () => {
+                if (request.result !== undefined) {
+                    Session.#rememberInMemory(request.result);
+                }
+
+                resolve(request.result);
+            };
+            request.onerror = () => resolve(undefined);
+        }));
+    }
+
+    // Private, not meant to be called by any external code.
+    static #putCached(entry) {
+        entry.used = Date.now();
+        Session.#rememberInMemory(entry);
+        Session.#openDB().then(db => {
+            if (db === undefined) {
+                return;
+            }
+
+            let store = db.transaction('responses', 'readwrite')
+                .objectStore('responses');
+            store.put(entry);
+
+            let count = store.count();
+            count.onsuccess = () => {
+                let excess = count.result - Session.#db_cache_limit;
+
+                if (excess <= 0) {
+                    return;
+                }
+
+                store.index('used').openCursor().onsuccess = event => {
+                    let cursor = event.target.result;
+
+                    if (cursor && excess > 0) {
+                        cursor.delete();
+                        excess--;
+                        cursor.continue();
+                    }
+                };
+            };
+        }).catch(() => {});
+    }
+
+    // Private, not meant to be called by any external code.
+    static #deleteCached(key) {
+        Session.#memory_cache.delete(key);
+        Session.#openDB().then(db => {
+            if (db !== undefined) {
+                db.transaction('responses', 'readwrite')
+                    .objectStore('responses').delete(key);
+            }
+        }).catch(() => {});
+    }
+
     /**
      *  Sends a request to the server side of Adaptyst Analyser.
      *  The request will be handled by the Python code of a
@@ -39,6 +197,20 @@ class Session {
      *  you don't have an eligible Window-inheriting object and
      *  don't want to create one.
      *
+     *  Identical requests sent while another one is still in
+     *  progress are not sent again, they all get the same response
+     *  instead. JSON, text, and HTML responses are also cached in
+     *  memory and IndexedDB. A cached response is used directly
+     *  if the session has not changed on the server side since it
+     *  was received and is revalidated with its ETag otherwise.
+     *  Responses with "Cache-Control: no-cache" are always
+     *  revalidated and responses with "Cache-Control: no-store"
+     *  are not cached at all.
+     *
+     *  If the server is busy (HTTP 503 with Retry-After), the request
+     *  is retried a few times with increasing delays, starting from
+     *  the time requested by the server, before failing.
+     *
      *  @param {String} entity ID of an entity.
      *  @param {String} node ID of a node.
      *  @param {String} module Name of a module.
@@ -63,14 +235,132 @@ class Session {
             content_type = 'json';
         }
 
-        $.ajax({
-            url: this.id + '/' + entity + '/' + node + '/' + module,
-            method: 'POST',
-            dataType: content_type,
-            data: data
-        }).done((data, status, xhr) => {
-            done_func(data);
-        }).fail(fail_func);
+        let key = JSON.stringify([this.id, entity, node, module,
+                                  content_type, data]);
+
+        if (key in Session.#in_flight) {
+            Session.#in_flight[key].push([done_func, fail_func]);
+            return;
+        }
+
+        Session.#in_flight[key] = [[done_func, fail_func]];
+
+        let finish = (succeeded, args) => {
+            let callbacks = Session.#in_flight[key];
+            delete Session.#in_flight[key];
+
+            for (const [done, fail] of callbacks) {
+                if (!succeeded) {
+                    fail(...args);
+                } else if (content_type === 'json') {
+                    done(structuredClone(args[0]));
+                } else {
+                    done(args[0]);
+                }
+            }
+        };
+
+        let cacheable = Session.#cacheable_types.includes(content_type);
+        let lookup = cacheable ? Session.#getCached(key) :
+            Promise.resolve(undefined);
+        let url = this.id + '/' + entity + '/' + node + '/' + module;
+        let label = module + ' [' + entity + '/' + node + ']';
+        let start = performance.now();
+
+        // A failed cache lookup is treated as a cache miss.
+        lookup.catch(() => undefined).then(entry => {
+            if (entry !== undefined && this.version !== undefined &&
+                entry.version === this.version) {
+                PerformancePanel.record(label + ' (cached)', undefined, {
+                    cache: performance.now() - start
+                });
+                finish(true, [entry.data]);
+                return;
+            }
+
+            let headers = {};
+
+            if (entry !== undefined && entry.etag) {
+                headers['If-None-Match'] = entry.etag;
+            }
+
+            let request_start = performance.now();
+            let attempt = 0;
+
+            let send = () => $.ajax({
+                url: url,
+                method: 'POST',
+                dataType: content_type,
+                data: data,
+                headers: headers
+            }).done((response, status, xhr) => {
+                let end = performance.now();
+                let network = PerformancePanel.getNetworkTime(
+                    url, request_start);
+                let timings = {};
+
+                if (network === undefined) {
+                    timings['network + parse'] = end - request_start;
+                } else {
+                    timings.network = network;
+                    timings.parse = end - request_start - network;
+                }
+
+                if (xhr.status === 304 && entry !== undefined) {
+                    response = entry.data;
+                    label += ' (revalidated)';
+                }
+
+                PerformancePanel.record(label, xhr, timings);
+
+                let cache_control =
+                    (xhr.getResponseHeader('Cache-Control') || '')
+                    .toLowerCase();
+
+                if (cacheable && cache_control.includes('no-store')) {
+                    Session.#deleteCached(key);
+                } else if (cacheable) {
+                    // "no-cache" responses are kept without the session
+                    // version, so that they are always revalidated.
+                    Session.#putCached({
+                        key: key,
+                        version: cache_control.includes('no-cache') ?
+                            undefined : this.version,
+                        etag: xhr.getResponseHeader('ETag'),
+                        data: response
+                    });
+                }
+
+                finish(true, [response]);
+            }).fail((...args) => {
+                PerformancePanel.record(label + ' (HTTP ' + args[0].status + ')',
+                                        args[0], {
+                                            network: performance.now() -
+                                                request_start
+                                        });
+
+                // The server is busy, try again later if it says when.
+                let retry_after = parseInt(
+                    args[0].getResponseHeader('Retry-After'));
+
+                if (args[0].status === 503 && !isNaN(retry_after) &&
+                    attempt < Session.#max_retries) {
+                    let delay = Math.min(Math.max(retry_after, 1) *
+                                         2 ** attempt,
+                                         Session.#max_retry_delay);
+                    attempt++;
+                    setTimeout(() => {
+                        request_start = performance.now();
+                        send();
+                    }, 1000 * delay * (1 + Math.random() / 2));
+                    return;
+                }
+
+                finish(false, args);
+            });
+
+            send();
+        });
     }
 }
 
@@ -1041,6 +1331,180 @@ class Menu {
     }
 }
 
+/**
+ *  This class contains static methods for managing the performance
+ *  panel, which shows how long recent requests took on both the
+ *  server side (based on Server-Timing headers) and the client side.
+ *  It is not meant to be constructed.
+ */
+class PerformancePanel {
+    // Private, not meant to be used by any external code.
+    static #entries = [];
+
+    // Private, not meant to be used by any external code.
+    static #max_entries = 30;
+
+    /**
+     *  Parses the value of a Server-Timing header.
+     *
+     *  @static
+     *  @param {String} header Value of a Server-Timing header. It can
+     *  be null or undefined.
+     *  @return {Array} Array of `{name: <name>, duration: <duration in
+     *  ms>, description: <description>}` objects.
+     */
+    static parseServerTiming(header) {
+        let phases = [];
+
+        if (!header) {
+            return phases;
+        }
+
+        for (const part of header.split(',')) {
+            let [name, ...params] = part.split(';');
+            let phase = {name: name.trim(), duration: 0,
+                         description: name.trim()};
+
+            for (const param of params) {
+                let [key, value] = param.split('=');
+                value = (value || '').trim().replace(/^"(.*)"$/, '$1');
+
+                if (key.trim() === 'dur') {
+                    phase.duration = parseFloat(value);
+                } else if (key.trim() === 'desc') {
+                    phase.description = value;
+                }
+            }
+
+            phases.push(phase);
+        }
+
+        return phases;
+    }
+
+    /**
+     *  Records the timings of a request to be shown in the performance
+     *  panel. Modules can call this method to report their client-side
+     *  phases, e.g. rendering.
+     *
+     *  @static
+     *  @param {String} label Human-readable label of a request.
+     *  @param {Object} [xhr] jqXHR object of a request, used for
+     *  getting server-side timings. It can be undefined.
+     *  @param {Object} [client] Dictionary mapping the names of
+     *  client-side phases to their durations in milliseconds. It can
+     *  be undefined.
+     */
+    static record(label, xhr, client) {
+        PerformancePanel.#entries.unshift({
+            label: label,
+            time: new Date(),
+            server: PerformancePanel.parseServerTiming(
+                xhr === undefined ? undefined :
+                    xhr.getResponseHeader('Server-Timing')),
+            client: client === undefined ? {} : client
+        });
+
+        if (PerformancePanel.#entries.length > PerformancePanel.#max_entries) {
+            PerformancePanel.#entries.pop();
+        }
+
+        if ($('#performance_panel').is(':visible')) {
+            PerformancePanel.#render();
+        }
+    }
+
+    /**
+     *  Gets the network time of a request based on the Resource
+     *  Timing API, i.e. the time from a given start point until
+     *  the last byte of the response has been received.
+     *
+     *  @static
+     *  @param {String} url URL of a request.
+     *  @param {Number} start Start time of a request, as returned by
+     *  `performance.now()`.
+     *  @return {Number} Network time in milliseconds or undefined if
+     *  it is unavailable.
+     */
+    static getNetworkTime(url, start) {
+        let entries = performance.getEntriesByName(
+            new URL(url, window.location.href).href);
+
+        for (let i = entries.length - 1; i >= 0; i--) {
+            if (entries[i].startTime >= start) {
+                return entries[i].responseEnd - start;
+            }
+        }
+
+        return undefined;
+    }
+
+    /**
+     *  Shows the performance panel if it is hidden and hides it
+     *  otherwise.
+     *
+     *  @static
+     */
+    static toggle() {
+        let panel = $('#performance_panel');
+
+        if (panel.length === 0) {
+            panel = $('<div id="performance_panel"></div>');
+            panel.on('click', Window.stopPropagation);
+            panel.hide();
+            $('body').append(panel);
+        }
+
+        if (panel.is(':visible')) {
+            panel.hide();
+        } else {
+            PerformancePanel.#render();
+            panel.show();
+        }
+    }
+
+    // Private, not meant to be called by any external code.
+    static #render() {
+        let panel = $('#performance_panel');
+        let table = $('<table></table>');
+
+        table.append($('<tr><th>Request</th><th>Server (ms)</th>' +
+                       '<th>Client (ms)</th></tr>'));
+
+        for (const entry of PerformancePanel.#entries) {
+            let row = $('<tr></tr>');
+            let server = $('<td></td>');
+            let client = $('<td></td>');
+
+            row.append($('<td></td>').text(entry.label).attr(
+                'title', entry.time.toLocaleTimeString()));
+
+            for (const phase of entry.server) {
+                server.append($('<div></div>').text(
+                    phase.name + ': ' + phase.duration.toFixed(1)).attr(
+                        'title', phase.description));
+            }
+
+            for (const [name, duration] of Object.entries(entry.client)) {
+                client.append($('<div></div>').text(
+                    name + ': ' + duration.toFixed(1)));
+            }
+
+            row.append(server);
+            row.append(client);
+            table.append(row);
+        }
+
+        if (PerformancePanel.#entries.length === 0) {
+            table.append($('<tr><td colspan="3">No requests have been ' +
+                           'made yet.</td></tr>'));
+        }
+
+        panel.empty();
+        panel.append(table);
+    }
+}
+
 // Private, not meant to be used by any external code.
 class SettingsWindow extends Window {
     #current_backend;
@@ -1146,22 +1610,39 @@ function loadCurrentSession() {
             new Session(id, label);
         let min_mod_vers = JSON.parse($('#viewer_script').attr('data-min-mod-vers'));
 
+        let start = performance.now();
+
         $.ajax({
             url: id + '/',
             method: 'GET'
-        }).done(ajax_obj => {
+        }).done((ajax_obj, status, xhr) => {
+            let timings = {network: performance.now() - start};
+            session.version = xhr.getResponseHeader('X-Session-Version') ||
+                undefined;
+
+            let phase_start = performance.now();
             let response = JSON.parse(ajax_obj);
             let graph = graphology.Graph.from(response.system);
-            let positions = forceAtlas2(graph, {
-                iterations: 50,
-                settings: {
-                    adjustSizes: true,
-                    gravity: 100
+            timings.parse = performance.now() - phase_start;
+            phase_start = performance.now();
+
+            // The layout may have been precomputed on the server side
+            // with "adaptyst-analyser --precompute".
+            if (!response.layout) {
+                let positions = forceAtlas2(graph, {
+                    iterations: 50,
+                    settings: {
+                        adjustSizes: true,
+                        gravity: 100
+                    }
+                });
+                for (let node of Object.keys(positions)) {
+                    graph.mergeNodeAttributes(node, positions[node]);
                 }
-            });
-            for (let node of Object.keys(positions)) {
-                graph.mergeNodeAttributes(node, positions[node]);
             }
+            timings.layout = performance.now() - phase_start;
+            phase_start = performance.now();
+
             let view = new Sigma(graph, $('#block')[0], {
                 renderEdgeLabels: true,
                 defaultEdgeType: 'curve',
@@ -1172,6 +1653,8 @@ function loadCurrentSession() {
                 edgeLabelSize: 20
             });
             view.getCamera().setState({ratio: 2});
+            timings.render = performance.now() - phase_start;
+            PerformancePanel.record('Session ' + label, xhr, timings);
             view.on('doubleClickNode', (node) => {
                 node.event.preventSigmaDefault();
                 let backends = graph.getNodeAttribute(node.node, 'backends');
@@ -1290,6 +1773,12 @@ function onSessionRefreshClick(event) {
     loadCurrentSession();
 }
 
+// Private, not meant to be called by any external code.
+function onPerformanceClick(event) {
+    Window.stopPropagation(event);
+    PerformancePanel.toggle();
+}
+
 // Private, not meant to be called by any external code.
 function onSettingsClick(event) {
     new SettingsWindow(undefined, undefined, undefined, {});
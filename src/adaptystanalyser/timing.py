@@ -0,0 +1,97 @@
+# SPDX-FileCopyrightText: 2026 CERN
+# SPDX-License-Identifier: LGPL-3.0-or-later
+
+import re
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+
+_phases = ContextVar('phases', default=None)
+
+
+def start_collecting():
+    """
+    Start collecting timing phases for the current request, discarding
+    the ones collected before.
+    """
+    _phases.set({})
+
+
+def get_phases() -> dict:
+    """
+    Get the timing phases collected for the current request.
+
+    :return: The dictionary mapping phase names to tuples of
+             the total duration in milliseconds and the description
+             (or None), in the order the phases first appeared.
+             It is empty if no phases are being collected.
+    """
+    phases = _phases.get()
+    return {} if phases is None else dict(phases)
+
+
+def add_phase(name: str, duration: float, description: str = None):
+    """
+    Record a timing phase of the current request, to be reported in
+    the Server-Timing header of the response. Durations of phases with
+    the same name are added up. Nothing is done if no phases are being
+    collected.
+
+    :param str name: The name of a phase (letters, digits, "-", and "_").
+    :param float duration: The duration in milliseconds.
+    :param str description: The human-readable description of a phase.
+                            It can be None.
+    """
+    phases = _phases.get()
+
+    if phases is None:
+        return
+
+    name = re.sub(r'[^A-Za-z0-9_-]', '_', name)
+
+    if name in phases:
+        phases[name] = (phases[name][0] + duration, phases[name][1])
+    else:
+        phases[name] = (duration, description)
+
+
+@contextmanager
+def phase(name: str, description: str = None):
+    """
+    Record the time spent inside the context as a timing phase of
+    the current request, see add_phase().
+
+    Modules can use this in process() to report their own phases, e.g.:
+
+        with phase('parse', 'Trace parsing'):
+            ...
+    """
+    start = time.perf_counter()
+
+    try:
+        yield
+    finally:
+        add_phase(name, (time.perf_counter() - start) * 1000, description)
+
+
+def format_header(phases: dict) -> str:
+    """
+    Format timing phases as the value of a Server-Timing header.
+
+    :param dict phases: The dictionary returned by get_phases().
+    :return: The header value.
+    """
+    entries = []
+
+    for name, (duration, description) in phases.items():
+        entry = f'{name};dur={duration:.2f}'
+
+        if description is not None:
+            description = description.encode('ascii', 'replace').decode() \
+                .replace('\\', '\\\\').replace('"', '\\"')
+            entry += f';desc="{description}"'
+
+        entries.append(entry)
+
+    return ', '.join(entries)